@@ -1,73 +1,179 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
-import folium
-from folium.plugins import HeatMap
-from streamlit_folium import st_folium
+import plotly.graph_objects as go
+import pydeck as pdk
+import hashlib
 import json
+import os
 import branca.colormap as cm
 
-# --- CSS STYLING (UI ENHANCEMENTS) ---
-def add_custom_css():
-    st.markdown("""
-        <style>
-        /* Modern, semi-transparent tooltips (Hover) - Opacity 0.7 */
-        .leaflet-tooltip {
-            background-color: rgba(255, 255, 255, 0.7) !important;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.3);
-            border: 1px solid #333;
-            border-radius: 8px;
-            font-family: 'Helvetica', sans-serif;
-            font-size: 13px;
-            font-weight: 500;
-        }
-        /* Remove default tooltip arrow for clean floating look */
-        .leaflet-tooltip-left:before, .leaflet-tooltip-right:before {
-            border: none !important;
-        }
-        
-        /* Modern, semi-transparent Popups (Click) - Opacity 0.6 (UPDATED) */
-        .leaflet-popup-content-wrapper {
-            background-color: rgba(255, 255, 255, 0.6) !important;
-            backdrop-filter: blur(5px); /* Adds a nice blur effect behind */
-        }
-        .leaflet-popup-tip {
-            border-top-color: rgba(255, 255, 255, 0.6) !important;
-        }
-        </style>
-        """, unsafe_allow_html=True)
-
 # --- PAGE CONFIGURATION ---
 st.set_page_config(page_title="Bristol Crime Analysis", layout="wide")
-add_custom_css()
 
 # --- 1. DATA LOADER ---
+def read_table(name):
+    # Prefer the typed Parquet copy written by convert_to_parquet.py; fall back to
+    # the CSV when there is no copy or the CSV has been regenerated since. The
+    # mtime check is best effort only (git does not keep mtimes), so re-run the
+    # script whenever the CSVs change. Parquet-only deploys skip the CSV check.
+    parquet_path, csv_path = f'{name}.parquet', f'{name}.csv'
+    if os.path.exists(parquet_path) and (
+        not os.path.exists(csv_path) or os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)
+    ):
+        return pd.read_parquet(parquet_path, engine='pyarrow')
+    return pd.read_csv(csv_path)
+
 @st.cache_data
 def load_data():
     # Load processed datasets (Incidents, Socioeconomic, and Venues)
     try:
-        incidents = pd.read_csv('app_data_incidents.csv')
-        master = pd.read_csv('app_data_master.csv')
-        pubs = pd.read_csv('bristol_pubs_restaurants.csv') # Night-Time Economy Data
+        incidents = read_table('app_data_incidents')
+        master = read_table('app_data_master')
+        pubs = read_table('bristol_pubs_restaurants') # Night-Time Economy Data
         
-        # Restore datetime objects
+        # Restore datetime objects (no-op when loaded from Parquet)
         incidents['Month'] = pd.to_datetime(incidents['Month'])
+        
+        # Keep incidents in month order so date filters can slice by position
+        incidents = incidents.sort_values('Month', kind='stable').reset_index(drop=True)
+        
+        # Categorical keys make filtering, counting and grouping work on integer codes
+        incidents['Crime type'] = incidents['Crime type'].astype('category')
+        incidents['LSOA21CD'] = pd.Categorical(incidents['LSOA21CD'], categories=master['LSOA21CD'])
         return incidents, master, pubs
     except FileNotFoundError as e:
         st.error(f"File not found: {e}")
         st.stop()
 
+@st.cache_data(show_spinner=False)
 def load_geojson():
+    # Parse the LSOA boundaries once per session rather than on every rerun.
+    # Uses the pre-simplified copy written by simplify_boundaries.py.
     try:
-        with open('raw_data/Lower_Layer_Super_Output_Areas_2021_(Precise).geojson') as f:
+        with open('lsoa_boundaries_simplified.geojson') as f:
             return json.load(f)
     except FileNotFoundError:
-        st.error("GeoJSON file not found. Check the 'data' folder.")
+        st.error("GeoJSON file not found. Run 'python simplify_boundaries.py' to generate it.")
         st.stop()
 
+@st.cache_data(max_entries=32, show_spinner=False)
+def inject_stats(stats):
+    # Return a new FeatureCollection with the given LSOA stats merged into each
+    # feature's properties. Features are shallow-copied so the cached raw
+    # parse is never mutated between reruns.
+    geojson = load_geojson()
+    cols = [c for c in stats.columns if c != 'LSOA21CD']
+    stats_dict = dict(zip(stats['LSOA21CD'], stats[cols].to_dict('records')))
+
+    features = []
+    for feature in geojson['features']:
+        lsoa_stats = stats_dict.get(feature['properties'].get('LSOA21CD'))
+        if lsoa_stats is not None:
+            feature = {**feature, 'properties': {**feature['properties'], **lsoa_stats}}
+        features.append(feature)
+    return {**geojson, 'features': features}
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def aggregate_heat(points, precision=4):
+    # Bin incident coordinates to a ~11m grid and return one row per cell
+    # (Latitude, Longitude, count), so the heatmap ships one weighted point
+    # per cell instead of every raw incident.
+    binned = points.dropna().round(precision)
+    return binned.groupby(['Latitude', 'Longitude']).size().reset_index(name='count')
+
+@st.cache_data(show_spinner=False)
+def monthly_pivot():
+    # Dense Month x Crime type incident counts over the full dataset
+    incidents, _, _ = load_data()
+    return incidents.groupby(['Month', 'Crime type'], observed=True).size().unstack(fill_value=0)
+
+@st.cache_data(show_spinner=False)
+def venue_points():
+    # Night-time economy venues for the map, built once per session from
+    # column arrays (no per-row Series as with iterrows). Name and type are
+    # plain text in the shared map tooltip fields; the markup lives in
+    # MAP_TOOLTIP_HTML.
+    _, _, pubs = load_data()
+    return pd.DataFrame({
+        'Latitude': pubs['Latitude'].to_numpy(),
+        'Longitude': pubs['Longitude'].to_numpy(),
+        'title': pubs['BUSINESS_NAME'].to_numpy(),
+        'subtitle': pubs['BUSINESS_TYPE'].to_numpy(),
+        'metric_label': '', 'metric_value': '',
+        'count_label': '', 'count_value': '',
+    })
+
+def filter_by_period(incidents, start_date, end_date):
+    # Restrict incidents to the selected month range (inclusive). Relies on
+    # load_data() sorting by Month, so the range is one contiguous slice.
+    bounds = np.array([start_date, end_date + pd.Timedelta(days=1)], dtype='datetime64[ns]')
+    lo, hi = incidents['Month'].values.searchsorted(bounds)
+    return incidents.iloc[lo:hi]
+
+def filter_by_crime(incidents, crimes):
+    return incidents[incidents['Crime type'].isin(crimes)]
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def filtered_incidents(start_date, end_date, crimes_key):
+    # Incidents matching the active sidebar filters (single definition shared
+    # by the dashboard, map, export and neighbourhood statistics)
+    incidents, _, _ = load_data()
+    return filter_by_crime(filter_by_period(incidents, start_date, end_date), crimes_key)
+
+def compute_crime_rates(master, incidents):
+    # Recalculate neighbourhood statistics based on active filters.
+    # LSOA21CD categories follow master's row order, so a bincount of the
+    # codes lines up with master directly (no merge, no stale columns).
+    codes = incidents['LSOA21CD'].cat.codes.to_numpy()
+    counts = np.bincount(codes[codes >= 0], minlength=len(master))
+    crime_rate = (counts / master['POP2022Total']) * 1000
+    return master.assign(
+        Period_Total_Crimes=counts,
+        Total_Crimes=counts,
+        Crime_Rate=crime_rate.fillna(0),
+    )
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def compute_master(start_date, end_date, crimes_key):
+    # Master table with crime totals and rates for one filter selection.
+    # Keyed only by the filter values; always builds a new frame from the
+    # cached base table instead of modifying it.
+    _, master, _ = load_data()
+    return compute_crime_rates(master, filtered_incidents(start_date, end_date, crimes_key))
+
+@st.cache_data(show_spinner=False)
+def most_deprived_index():
+    # IMD scores do not depend on the filters, so the Top 10 is found once
+    _, master, _ = load_data()
+    return master.nlargest(10, 'IMDScore').index
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def top_crime_rates(start_date, end_date, crimes_key):
+    # Top 10 crime rates per filter selection (nlargest is a partial sort)
+    master = compute_master(start_date, end_date, crimes_key)
+    return master.nlargest(10, 'Crime_Rate')[['LSOA21LN', 'Crime_Rate', 'IMDScore']]
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def to_csv_bytes(start_date, end_date, crimes_key):
+    # Encode the filtered export once per filter combination, not on every rerun
+    return filtered_incidents(start_date, end_date, crimes_key).to_csv(index=False).encode('utf-8')
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def ols_line(x, y):
+    # Least-squares fit for the scatter trendline: returns (slope, intercept, r2)
+    slope, intercept = np.polyfit(x, y, 1)
+    residuals = y - (slope * x + intercept)
+    ss_tot = ((y - y.mean()) ** 2).sum()
+    r2 = 1 - (residuals ** 2).sum() / ss_tot if ss_tot else 0.0
+    return slope, intercept, r2
+
 # Initialize
-incidents_df, master_df, pubs_df = load_data()
-geojson_data = load_geojson()
+incidents_df, _, _ = load_data()
+
+# Fixed colour per crime category, shared by every chart (Dark24 stays readable on white)
+CRIME_COLORS = dict(zip(incidents_df['Crime type'].cat.categories, px.colors.qualitative.Dark24))
 
 # --- 2. SIDEBAR FILTERS ---
 st.sidebar.header("Filters")
@@ -87,20 +193,9 @@ start_date, end_date = st.sidebar.slider(
     format="MMM YYYY"
 )
 
-time_mask = (incidents_df['Month'].dt.date >= start_date) & (incidents_df['Month'].dt.date <= end_date)
-base_filtered_incidents = incidents_df.loc[time_mask]
-
-# --- FILTER 2: MAP METRIC ---
-st.sidebar.subheader("Map Layer")
-map_metric = st.sidebar.radio(
-    "Colour Map By (Socioeconomic Factor):",
-    options=['Crime_Rate', 'IMDScore', 'Income', 'Employment', 'None (Boundaries Only)'],
-    format_func=lambda x: "Crimes per 1,000" if x == 'Crime_Rate' 
-                          else ("Boundaries Only (Transparent)" if x == 'None (Boundaries Only)' 
-                          else x + " Deprivation")
-)
+base_filtered_incidents = filter_by_period(incidents_df, start_date, end_date)
 
-# --- FILTER 3: CRIME TYPE (MOVED DOWN & DEFAULT ALL) ---
+# --- FILTER 2: CRIME TYPE (DEFAULT ALL) ---
 st.sidebar.subheader("Crime Categories")
 
 all_crimes = base_filtered_incidents['Crime type'].unique().tolist()
@@ -111,15 +206,15 @@ selected_crimes = st.sidebar.multiselect(
     default=all_crimes # Selects ALL by default
 )
 
-filtered_incidents = base_filtered_incidents[base_filtered_incidents['Crime type'].isin(selected_crimes)]
+crimes_key = tuple(sorted(selected_crimes)) # Hashable cache key for the selection
 
 
-# --- FILTER 4: EXPORT ---
+# --- FILTER 3: EXPORT ---
 st.sidebar.markdown("---")
 st.sidebar.subheader("Export Data")
 st.sidebar.download_button(
     label="📥 Download Filtered Dataset",
-    data=filtered_incidents.to_csv(index=False).encode('utf-8'),
+    data=to_csv_bytes(start_date, end_date, crimes_key),
     file_name='bristol_crime_filtered.csv',
     mime='text/csv',
     help="Download the dataset currently displayed."
@@ -128,30 +223,204 @@ st.sidebar.download_button(
 # --- 3. DYNAMIC DATA AGGREGATION ---
 # Recalculate neighbourhood statistics based on active filters.
 
-# 1. Aggregate Incident Counts (LSOA21CD is the key)
-current_crime_counts = filtered_incidents['LSOA21CD'].value_counts().reset_index()
-current_crime_counts.columns = ['LSOA21CD', 'Period_Total_Crimes']
+master_df = compute_master(start_date, end_date, crimes_key)
+# Every incident maps to an LSOA row, so the per-area totals tell us whether the
+# filters matched anything without fetching the incident frame itself
+has_incidents = master_df['Total_Crimes'].sum() > 0
 
-# 2. Drop stale columns to prevent merge collisions
-cols_to_drop = ['Period_Total_Crimes', 'Total_Crimes', 'Crime_Rate']
-master_df = master_df.drop(columns=[c for c in cols_to_drop if c in master_df.columns])
 
-# 3. Merge new counts
-master_df = pd.merge(master_df, current_crime_counts, on='LSOA21CD', how='left')
+# --- 4. MAP BUILDER ---
+MAP_STYLES = {'Simple Background': 'light', 'Detailed Streets': 'road'}
 
-# 4. Recalculate Rates
-master_df['Period_Total_Crimes'] = master_df['Period_Total_Crimes'].fillna(0)
-master_df['Total_Crimes'] = master_df['Period_Total_Crimes']
-master_df['Crime_Rate'] = (master_df['Total_Crimes'] / master_df['POP2022Total']) * 1000
-master_df['Crime_Rate'] = master_df['Crime_Rate'].fillna(0)
+# One tooltip template is shared by every pickable layer, so each layer fills
+# all of these fields (blank where unused; empty rows collapse). Values are
+# plain text: Streamlit HTML-escapes anything substituted into the template.
+MAP_TOOLTIP_HTML = (
+    "<div><b>{title}</b></div>"
+    "<div>{subtitle}</div>"
+    "<div><b>{metric_label}</b> {metric_value}</div>"
+    "<div><b>{count_label}</b> {count_value}</div>"
+)
+
+# Modern, semi-transparent tooltips (Hover)
+MAP_TOOLTIP_STYLE = {
+    'backgroundColor': 'rgba(255, 255, 255, 0.7)',
+    'color': 'black',
+    'boxShadow': '0 4px 6px rgba(0,0,0,0.3)',
+    'border': '1px solid #333',
+    'borderRadius': '8px',
+    'fontFamily': 'Helvetica, sans-serif',
+    'fontSize': '13px',
+    'fontWeight': '500',
+}
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def build_map(start_date, end_date, crimes_key, metric, background, show_hotspots, show_venues):
+    # Build the pydeck (deck.gl/WebGL) map for one filter and layer combination.
+    # Keyed by hashable primitives only so unrelated reruns reuse the cached
+    # Deck. Returns the Deck and the legend HTML (None for boundaries only).
+    filtered = filtered_incidents(start_date, end_date, crimes_key)
+    master = compute_master(start_date, end_date, crimes_key)
+    layers = []
+    legend = None
+
+    # 1. Neighbourhood Layer: "Boundaries Only" vs "Coloured Map"
+    # Tooltip fields are prepared per LSOA and injected into the GeoJSON properties
+    tooltip = master[['LSOA21CD']].assign(
+        title=master['LSOA21LN'], subtitle=master['LSOA21NM'],
+        metric_label='', metric_value='', count_label='', count_value=''
+    )
+
+    if metric == 'None (Boundaries Only)':
+        # --- TRANSPARENT LAYER LOGIC ---
+        geojson = inject_stats(tooltip)
+        layers.append(pdk.Layer(
+            'GeoJsonLayer',
+            geojson,
+            id='lsoa-boundaries',
+            filled=True, stroked=True,
+            get_fill_color=[0, 0, 0, 0],
+            get_line_color=[0, 0, 0],
+            line_width_min_pixels=0.8,
+            pickable=True, auto_highlight=True,
+            highlight_color=[0, 0, 255, 25]
+        ))
+        
+    else:
+        # --- STANDARD CHOROPLETH LOGIC ---
+        min_val = master[metric].min()
+        max_val = master[metric].max()
+        if min_val == max_val: max_val += 1
+            
+        colormap = cm.linear.YlOrRd_09.scale(min_val, max_val)
+        colormap.caption = f"Legend: {metric}"
+        # Legend: gradient bar built from the colormap's public colour lookup
+        stops = ', '.join(colormap.rgb_hex_str(v) for v in np.linspace(min_val, max_val, 9))
+        legend = (
+            f"<div style='font-size:13px; font-weight:500'>{colormap.caption}</div>"
+            f"<div style='height:12px; border:1px solid #333; background:linear-gradient(to right, {stops})'></div>"
+            f"<div style='display:flex; justify-content:space-between; font-size:12px'>"
+            f"<span>{min_val:,.2f}</span><span>{max_val:,.2f}</span></div>"
+        )
+
+        # Pre-compute fill colours (gray for missing values) as RGB columns
+        rgb = np.array([colormap.rgba_bytes_tuple(v)[:3] if pd.notna(v) else (128, 128, 128) for v in master[metric]])
+
+        if metric == 'Crime_Rate':
+            tooltip = tooltip.assign(
+                metric_label='Crime Rate/1000:', metric_value=master[metric].map('{:,.2f}'.format),
+                count_label='Total Incidents:', count_value=master['Total_Crimes'].map('{:,}'.format)
+            )
+        else:
+            tooltip = tooltip.assign(metric_label=f'{metric} Score:', metric_value=master[metric].map('{:,.2f}'.format))
+
+        stats = tooltip.assign(fill_r=rgb[:, 0], fill_g=rgb[:, 1], fill_b=rgb[:, 2])
+        layers.append(pdk.Layer(
+            'GeoJsonLayer',
+            inject_stats(stats),
+            id='lsoa-choropleth',
+            filled=True, stroked=True,
+            get_fill_color='[properties.fill_r, properties.fill_g, properties.fill_b, 178]',
+            get_line_color=[0, 0, 0],
+            line_width_min_pixels=0.5,
+            pickable=True, auto_highlight=True,
+            highlight_color=[0, 0, 0, 80]
+        ))
+
+    # 2. Crime Hotspot Layer (GPU Heatmap)
+    if show_hotspots:
+        heat_data = aggregate_heat(filtered[['Latitude', 'Longitude']])
+        if not heat_data.empty:
+            layers.append(pdk.Layer(
+                'HeatmapLayer',
+                heat_data,
+                id='crime-hotspots',
+                get_position='[Longitude, Latitude]',
+                get_weight='count',
+                radius_pixels=25, opacity=0.6,
+                color_range=[[0, 0, 255], [0, 255, 0], [255, 0, 0]]
+            ))
+        
+    # 3. NIGHT-TIME ECONOMY LAYER
+    if show_venues:
+        layers.append(pdk.Layer(
+            'ScatterplotLayer',
+            venue_points(),
+            id='night-time-economy',
+            get_position='[Longitude, Latitude]',
+            get_fill_color=[0, 0, 0, 204],
+            get_radius=30, radius_min_pixels=3,
+            pickable=True
+        ))
+
+    # 4. Assemble Deck
+    deck = pdk.Deck(
+        layers=layers,
+        initial_view_state=pdk.ViewState(latitude=51.4545, longitude=-2.5879, zoom=12),
+        map_provider='carto',
+        map_style=MAP_STYLES[background],
+        tooltip={'html': MAP_TOOLTIP_HTML, 'style': MAP_TOOLTIP_STYLE}
+    )
+    return deck, legend
+
+
+# Map controls live outside the sidebar, and Streamlit drops a widget's state
+# whenever it is not drawn (e.g. while another view is selected). Their values
+# are mirrored into plain session_state entries and restored on each render.
+MAP_CONTROL_DEFAULTS = {
+    'map_metric': 'Crime_Rate',
+    'map_background': 'Simple Background',
+    'show_hotspots': True,
+    'show_venues': False,
+}
+
+def restore_map_controls():
+    for key, default in MAP_CONTROL_DEFAULTS.items():
+        st.session_state[key] = st.session_state.setdefault(f'saved_{key}', default)
+
+def save_map_control(key):
+    st.session_state[f'saved_{key}'] = st.session_state[key]
+
+@st.fragment
+def render_map(start_date, end_date, crimes_key):
+    # Runs as a fragment: switching the map layer reruns only this block,
+    # not the sidebar, stat cards or other tabs.
+    restore_map_controls()
+    
+    map_metric = st.radio(
+        "Colour Map By (Socioeconomic Factor):",
+        options=['Crime_Rate', 'IMDScore', 'Income', 'Employment', 'None (Boundaries Only)'],
+        format_func=lambda x: "Crimes per 1,000" if x == 'Crime_Rate' 
+                              else ("Boundaries Only (Transparent)" if x == 'None (Boundaries Only)' 
+                              else x + " Deprivation"),
+        horizontal=True,
+        key='map_metric', on_change=save_map_control, args=('map_metric',)
+    )
+    
+    # Layer controls (deck.gl has no built-in layer switcher)
+    bg_col, heat_col, venue_col = st.columns([2, 1, 1])
+    background = bg_col.radio("Background:", options=list(MAP_STYLES), horizontal=True,
+                              key='map_background', on_change=save_map_control, args=('map_background',))
+    show_hotspots = heat_col.toggle("Crime Hotspots",
+                                    key='show_hotspots', on_change=save_map_control, args=('show_hotspots',))
+    show_venues = venue_col.toggle("Night-Time Economy",
+                                   key='show_venues', on_change=save_map_control, args=('show_venues',))
+    
+    st.subheader(f"Geospatial Map: {map_metric}")
+    
+    deck, legend = build_map(start_date, end_date, crimes_key, map_metric, background, show_hotspots, show_venues)
+    
+    st.pydeck_chart(deck, use_container_width=True)
+    if legend:
+        st.markdown(legend, unsafe_allow_html=True)
 
 
-# --- 4. MAIN DASHBOARD UI ---
+# --- 5. MAIN DASHBOARD UI ---
 st.title("Spatial Analysis of Crime in Bristol")
 
 # --- STATIC DATA OVERVIEW (GLOBAL STATS) ---
 with st.expander("Dataset Overview (Global Statistics)", expanded=True):
-    if not filtered_incidents.empty:
+    if has_incidents:
         total_records = len(incidents_df)
         unique_categories = incidents_df['Crime type'].nunique()
         date_range = f"{incidents_df['Month'].min().strftime('%b %Y')} - {incidents_df['Month'].max().strftime('%b %Y')}"
@@ -177,145 +446,77 @@ with st.expander("Dataset Overview (Global Statistics)", expanded=True):
 st.markdown("### Visualisation and Statistical Exploration of Crime Patterns vs. Socioeconomic Factors")
 
 
-tab1, tab2, tab3 = st.tabs(["Spatial Analysis", "Statistical Correlation", "Data Explorer"])
+# Tab selector: unlike st.tabs (which executes every tab body on each rerun),
+# only the selected view's charts and tables are built.
+active_tab = st.radio(
+    "View:",
+    options=["Spatial Analysis", "Statistical Correlation", "Data Explorer"],
+    horizontal=True,
+    label_visibility="collapsed",
+    key="active_tab"
+)
 
 # --- TAB 1: GEOSPATIAL MAP (UPDATED LOGIC) ---
-with tab1:
+if active_tab == "Spatial Analysis":
     col1, col2 = st.columns([3, 1])
     with col1:
-        st.subheader(f"Geospatial Map: {map_metric}")
-        
-        # 1. Inject Data into GeoJSON for Tooltips
-        stats_dict = master_df.set_index('LSOA21CD').to_dict('index')
-        for feature in geojson_data['features']:
-            lsoa_id = feature['properties'].get('LSOA21CD')
-            if lsoa_id in stats_dict:
-                feature['properties'].update(stats_dict[lsoa_id])
-
-        # 2. Initialize Map
-        m = folium.Map(location=[51.4545, -2.5879], zoom_start=12, tiles=None)
-        folium.TileLayer('cartodbpositron', name='Simple Background').add_to(m)
-        folium.TileLayer('OpenStreetMap', name='Detailed Streets').add_to(m)
-
-        # 3. Handle "Boundaries Only" vs "Coloured Map" Logic
-        if map_metric == 'None (Boundaries Only)':
-            # --- TRANSPARENT LAYER LOGIC ---
-            folium.GeoJson(
-                geojson_data,
-                name="LSOA Boundaries",
-                style_function=lambda feature: {
-                    'fillColor': 'transparent', 
-                    'color': 'black',           
-                    'weight': 0.8,              
-                    'fillOpacity': 0,
-                },
-                highlight_function=lambda x: {'weight': 2, 'color': 'blue', 'fillOpacity': 0.1},
-                tooltip=folium.GeoJsonTooltip(
-                    fields=['LSOA21LN', 'LSOA21NM'], 
-                    aliases=['Local Name:', 'Code Name:'], 
-                    sticky=True
-                )
-            ).add_to(m)
-            
-        else:
-            # --- STANDARD CHOROPLETH LOGIC ---
-            min_val = master_df[map_metric].min()
-            max_val = master_df[map_metric].max()
-            if min_val == max_val: max_val += 1
-                
-            colormap = cm.linear.YlOrRd_09.scale(min_val, max_val)
-            colormap.caption = f"Legend: {map_metric}"
-
-            if map_metric == 'Crime_Rate':
-                t_fields = ['LSOA21LN', 'LSOA21NM', map_metric, 'Total_Crimes']
-                t_aliases = ['Local Name:', 'Code Name:', 'Crime Rate/1000:', 'Total Incidents:']
-            else:
-                t_fields = ['LSOA21LN', 'LSOA21NM', map_metric]
-                t_aliases = ['Local Name:', 'Code Name:', f'{map_metric} Score:']
-
-            folium.GeoJson(
-                geojson_data,
-                name=f"Neighbourhood Areas ({map_metric})",
-                style_function=lambda feature: {
-                    'fillColor': colormap(feature['properties'][map_metric]) if feature['properties'].get(map_metric) is not None else 'gray',
-                    'color': 'black', 'weight': 0.5, 'fillOpacity': 0.7,
-                },
-                highlight_function=lambda x: {'weight': 2, 'color': 'black', 'fillOpacity': 1.0},
-                tooltip=folium.GeoJsonTooltip(fields=t_fields, aliases=t_aliases, localize=True, sticky=True)
-            ).add_to(m)
-            
-            colormap.add_to(m)
-
-        # 4. Crime Hotspot Layer (Heatmap)
-        heat_data = filtered_incidents[['Latitude', 'Longitude']].dropna().values.tolist()
-        if heat_data:
-            HeatMap(
-                heat_data, 
-                name="Crime Hotspots", 
-                radius=10, blur=15, min_opacity=0.4,
-                gradient={0.4: 'blue', 0.65: 'lime', 1: 'red'}
-            ).add_to(m)
-            
-        # 5. NIGHT-TIME ECONOMY LAYER
-        pub_layer = folium.FeatureGroup(name="Night-Time Economy", show=False)
-        
-        for _, row in pubs_df.iterrows():
-            folium.CircleMarker(
-                location=[row['Latitude'], row['Longitude']],
-                radius=3,
-                color='black',
-                weight=0,
-                fill=True,
-                fill_color='black', 
-                fill_opacity=0.8,
-                popup=folium.Popup(f"<b>{row['BUSINESS_NAME']}</b><br>{row['BUSINESS_TYPE']}", max_width=200)
-            ).add_to(pub_layer)
-        pub_layer.add_to(m)
-
-        # 6. Render Map
-        folium.LayerControl(collapsed=False).add_to(m) 
-        
-        st_folium(m, height=700, width=None) 
+        render_map(start_date, end_date, crimes_key)
         
     with col2:
         st.write("### Map Interpretation")
         st.info(f"""
-        **Layer Controls (Top Right):**
+        **Layer Controls (Above the Map):**
         * **Simple Background:** Best for viewing deprivation colours.
         * **Crime Hotspots:** The heatmap of filtered incidents.
         * **Night-Time Economy:** Toggles Pubs & Clubs (Black Dots).
         
         **Analysis Tip:**
-        1. Select **'Boundaries Only'** in the sidebar.
-        2. Turn on **Crime Hotspots** in the map layer control.
+        1. Select **'Boundaries Only'** above the map.
+        2. Turn on **Crime Hotspots** in the layer controls.
         3. Turn on **Night-Time Economy**.
         4. Observe how the black dots (Clubs) align perfectly with the hotspots!
         """)
 
 # --- TAB 2: STATISTICAL ANALYSIS ---
-with tab2:
+elif active_tab == "Statistical Correlation":
     st.subheader("Crime Distribution Trends")
     
     # Chart 1: Categorical Distribution
-    if not filtered_incidents.empty:
-        fig_bar = px.bar(filtered_incidents['Crime type'].value_counts().reset_index(), 
-                          x='Crime type', y='count', color='Crime type',
-                          title=f"Total Recorded Incidents by Category ({start_date} to {end_date})")
-        st.plotly_chart(fig_bar, use_container_width=True)
+    if has_incidents:
+        # Slice the precomputed month x crime counts instead of regrouping incidents
+        monthly_counts = monthly_pivot().loc[pd.Timestamp(start_date):pd.Timestamp(end_date), selected_crimes]
+        crime_counts = monthly_counts.sum().sort_values(ascending=False).rename('count')
+        crime_counts = crime_counts[crime_counts > 0]
+        
+        # Reuse the previous figure when the counts (and title) are unchanged
+        bar_title = f"Total Recorded Incidents by Category ({start_date} to {end_date})"
+        bar_key = hashlib.blake2b(
+            pd.util.hash_pandas_object(crime_counts, index=True).values.tobytes() + bar_title.encode(),
+            digest_size=8
+        ).hexdigest()
+        if st.session_state.get('bar_key') != bar_key:
+            st.session_state['bar_fig'] = px.bar(crime_counts.reset_index(), 
+                                                 x='Crime type', y='count', color='Crime type',
+                                                 color_discrete_map=CRIME_COLORS,
+                                                 title=bar_title)
+            st.session_state['bar_key'] = bar_key
+        fig_bar = st.session_state['bar_fig']
+        st.plotly_chart(fig_bar, key='bar_crime', use_container_width=True)
         
         # Chart 2: Temporal Trends
         st.subheader("Temporal Analysis: Monthly Crime Trends")
-        monthly_trends = filtered_incidents.groupby(['Month', 'Crime type']).size().reset_index(name='Incident_Count')
-        crime_order = filtered_incidents['Crime type'].value_counts().index.tolist()
+        monthly_trends = monthly_counts.reset_index().melt(id_vars='Month', var_name='Crime type', value_name='Incident_Count')
+        monthly_trends = monthly_trends[monthly_trends['Incident_Count'] > 0]
+        crime_order = crime_counts.index.tolist()
         
         fig_line = px.line(
             monthly_trends, x='Month', y='Incident_Count', color='Crime type', 
             title="Crime Trends Over Time", markers=True,
             category_orders={"Crime type": crime_order},
-            color_discrete_sequence=px.colors.qualitative.Bold
+            color_discrete_map=CRIME_COLORS
         )
         fig_line.update_xaxes(dtick="M1", tickformat="%b %Y")
-        st.plotly_chart(fig_line, use_container_width=True)
+        st.plotly_chart(fig_line, key='line_trends', use_container_width=True)
         
         st.divider()
         
@@ -328,34 +529,42 @@ with tab2:
                 master_df, x='Income', y='Crime_Rate', 
                 marginal_x="box", marginal_y="box",
                 hover_name='LSOA21LN', hover_data=['LSOA21NM'], 
-                trendline="ols",
                 title="Correlation: Income Deprivation vs. Crime Rate",
                 labels={'Income': 'Income Score (Higher = Poorer)', 'Crime_Rate': 'Crimes per 1,000'}
             )
-            st.plotly_chart(fig_scatter, use_container_width=True)
+            
+            # OLS trendline from the cached NumPy fit (replaces trendline="ols")
+            slope, intercept, r2 = ols_line(master_df['Income'].to_numpy(), master_df['Crime_Rate'].to_numpy())
+            x_range = np.array([master_df['Income'].min(), master_df['Income'].max()])
+            fig_scatter.add_trace(go.Scatter(
+                x=x_range, y=slope * x_range + intercept,
+                mode='lines', name='OLS trendline', showlegend=False,
+                hovertemplate=f"<b>OLS trendline</b><br>Crime_Rate = {slope:.4f} * Income + {intercept:.4f}<br>R<sup>2</sup>={r2:.6f}<extra></extra>"
+            ))
+            st.plotly_chart(fig_scatter, key='scatter_income', use_container_width=True)
         
         with col_b:
             corr = master_df[['Crime_Rate', 'IMDScore', 'Income', 'Employment', 'EducationScore']].corr()
             fig_corr = px.imshow(corr, text_auto=True, color_continuous_scale='RdBu_r', 
                                  title="Statistical Correlation Matrix")
-            st.plotly_chart(fig_corr, use_container_width=True)
+            st.plotly_chart(fig_corr, key='corr_matrix', use_container_width=True)
     else:
         st.info("Please adjust filters to see statistical analysis.")
 
 # --- TAB 3: DATA EXPLORER ---
-with tab3:
+elif active_tab == "Data Explorer":
     st.subheader("Comparative Analysis: Poverty vs. Crime Hotspots")
     col1, col2 = st.columns(2)
 
     with col1:
         st.markdown("### Top 10 Most Deprived")
-        top_deprived = master_df.sort_values(by='IMDScore', ascending=False).head(10)
-        st.dataframe(top_deprived[['LSOA21LN', 'IMDScore', 'Crime_Rate']], hide_index=True, use_container_width=True)
+        top_deprived = master_df.loc[most_deprived_index(), ['LSOA21LN', 'IMDScore', 'Crime_Rate']]
+        st.dataframe(top_deprived, hide_index=True, use_container_width=True)
 
     with col2:
         st.markdown("### Top 10 Highest Crime Rates")
-        top_crime = master_df.sort_values(by='Crime_Rate', ascending=False).head(10)
-        st.dataframe(top_crime[['LSOA21LN', 'Crime_Rate', 'IMDScore']], hide_index=True, use_container_width=True)
+        top_crime = top_crime_rates(start_date, end_date, crimes_key)
+        st.dataframe(top_crime, hide_index=True, use_container_width=True)
 
     # Overlap Logic
     deprived_names = set(top_deprived['LSOA21LN'])
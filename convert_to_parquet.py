@@ -0,0 +1,36 @@
+"""
+One-off preprocessing step: write Parquet copies of the dashboard CSVs.
+
+CSV parsing (plus re-parsing the Month column) is the slowest part of a cold
+start. Parquet keeps the dtypes, so app.py can load these files without the
+datetime and categorical conversion passes. The .parquet files are committed
+alongside the CSVs, so re-run this script (and commit the output) whenever a
+CSV changes; app.py only falls back on an mtime check, which a fresh clone
+does not preserve.
+
+Usage:
+    python convert_to_parquet.py
+"""
+import pandas as pd
+
+TABLES = ['app_data_incidents', 'app_data_master', 'bristol_pubs_restaurants']
+
+
+def prepare(name, df):
+    # Store incidents with the dtypes load_data() would otherwise rebuild
+    if name == 'app_data_incidents':
+        df['Month'] = pd.to_datetime(df['Month'])
+        df['Crime type'] = df['Crime type'].astype('category')
+        df['LSOA21CD'] = df['LSOA21CD'].astype('category')
+    return df
+
+
+def main():
+    for name in TABLES:
+        df = prepare(name, pd.read_csv(f'{name}.csv'))
+        df.to_parquet(f'{name}.parquet', engine='pyarrow', index=False)
+        print(f"{name}.csv -> {name}.parquet ({len(df):,} rows)")
+
+
+if __name__ == '__main__':
+    main()
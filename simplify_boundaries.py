@@ -0,0 +1,164 @@
+"""
+One-off preprocessing step: simplify the LSOA boundary GeoJSON for the dashboard.
+
+The "Precise" LSOA file carries far more vertices than a city-scale Leaflet map
+can show, and every one of them is parsed in Python and shipped to the browser.
+This script writes a lighter copy that app.py loads instead.
+
+Simplification is topology-aware (the same idea as mapshaper/topojson): shared
+borders are split into arcs at junction vertices and each arc is simplified
+once, so neighbouring LSOAs still meet exactly with no gaps or overlaps.
+
+Usage:
+    python simplify_boundaries.py
+"""
+import json
+import math
+from collections import defaultdict
+
+SOURCE = 'raw_data/Lower_Layer_Super_Output_Areas_2021_(Precise).geojson'
+TARGET = 'lsoa_boundaries_simplified.geojson'
+
+TOLERANCE_M = 5.0       # Douglas-Peucker tolerance in metres
+PRECISION = 6           # Decimal places kept for coordinates (~0.1m)
+METRES_PER_DEGREE = 111320.0
+LAT_SCALE = math.cos(math.radians(51.45))  # Shrink longitude to metres at Bristol's latitude
+
+
+# --- 1. GEOMETRY HELPERS ---
+def polygons_of(geometry):
+    # Normalise Polygon / MultiPolygon coordinates to a list of polygons
+    if geometry['type'] == 'Polygon':
+        return [geometry['coordinates']]
+    return geometry['coordinates']
+
+def quantize_ring(ring):
+    # Round coordinates and drop consecutive duplicates (ring stays closed)
+    out = []
+    for lon, lat in ring:
+        point = (round(lon, PRECISION), round(lat, PRECISION))
+        if not out or out[-1] != point:
+            out.append(point)
+    if out[0] != out[-1]:
+        out.append(out[0])
+    return out
+
+def distance_m(p, a, b):
+    # Distance from point p to segment a-b, in metres
+    px, py = p[0] * LAT_SCALE, p[1]
+    ax, ay = a[0] * LAT_SCALE, a[1]
+    bx, by = b[0] * LAT_SCALE, b[1]
+    dx, dy = bx - ax, by - ay
+    if dx == 0 and dy == 0:
+        return math.hypot(px - ax, py - ay) * METRES_PER_DEGREE
+    t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / (dx * dx + dy * dy)))
+    return math.hypot(px - (ax + t * dx), py - (ay + t * dy)) * METRES_PER_DEGREE
+
+def douglas_peucker(points):
+    # Iterative Douglas-Peucker; always keeps both endpoints
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        max_dist, index = 0.0, None
+        for i in range(start + 1, end):
+            d = distance_m(points[i], points[start], points[end])
+            if d > max_dist:
+                max_dist, index = d, i
+        if index is not None and max_dist > TOLERANCE_M:
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+    return [p for p, k in zip(points, keep) if k]
+
+
+# --- 2. TOPOLOGY ---
+def find_junctions(rings):
+    # A vertex is a junction if the set of rings using it changes there, or it
+    # is used by 3+ rings. Arcs between junctions are shared verbatim by
+    # neighbouring LSOAs, so simplifying each arc once keeps borders aligned.
+    owners = defaultdict(set)
+    uses = defaultdict(int)
+    for ring_id, ring in enumerate(rings):
+        for point in ring[:-1]:
+            owners[point].add(ring_id)
+            uses[point] += 1
+
+    junctions = {p for p in owners if len(owners[p]) >= 3 or uses[p] != len(owners[p])}
+    for ring in rings:
+        body = ring[:-1]
+        for i, point in enumerate(body):
+            if owners[point] != owners[body[i - 1]] or owners[point] != owners[body[(i + 1) % len(body)]]:
+                junctions.add(point)
+    return junctions
+
+def simplify_ring(ring, junctions, arc_cache):
+    body = ring[:-1]
+    anchors = [i for i, p in enumerate(body) if p in junctions]
+    if not anchors:
+        # Isolated ring (or one shared whole with a single neighbour):
+        # anchor on the smallest vertex so both copies split identically
+        anchors = [body.index(min(body))]
+
+    # Rotate so the ring starts on an anchor, then walk arc by arc
+    start = anchors[0]
+    rotated = body[start:] + body[:start] + [body[start]]
+    cut_points = [i - start for i in anchors] + [len(body)]
+
+    simplified = [rotated[0]]
+    for a, b in zip(cut_points, cut_points[1:]):
+        arc = rotated[a:b + 1]
+        # Simplify in a canonical direction so shared arcs get identical output
+        canonical = min(arc, arc[::-1])
+        if tuple(canonical) not in arc_cache:
+            arc_cache[tuple(canonical)] = douglas_peucker(canonical)
+        result = arc_cache[tuple(canonical)]
+        if canonical is not arc:
+            result = result[::-1]
+        simplified.extend(result[1:])
+
+    # Guard against collapsing tiny rings
+    if len(simplified) < 4:
+        return ring
+    return simplified
+
+
+# --- 3. MAIN ---
+def main():
+    with open(SOURCE) as f:
+        geojson = json.load(f)
+
+    # Gather every ring once so shared borders can be detected across features
+    rings = []
+    for feature in geojson['features']:
+        for polygon in polygons_of(feature['geometry']):
+            rings.extend(quantize_ring(ring) for ring in polygon)
+
+    junctions = find_junctions(rings)
+    arc_cache = {}
+
+    ring_iter = iter(rings)
+    before = after = 0
+    for feature in geojson['features']:
+        geometry = feature['geometry']
+        polygons = []
+        for polygon in polygons_of(geometry):
+            new_polygon = []
+            for _ in polygon:
+                ring = next(ring_iter)
+                new_ring = simplify_ring(ring, junctions, arc_cache)
+                before += len(ring)
+                after += len(new_ring)
+                new_polygon.append([list(p) for p in new_ring])
+            polygons.append(new_polygon)
+        geometry['coordinates'] = polygons[0] if geometry['type'] == 'Polygon' else polygons
+
+    with open(TARGET, 'w') as f:
+        json.dump(geojson, f, separators=(',', ':'))
+
+    print(f"Vertices: {before:,} -> {after:,} ({after / before:.1%}). Written to {TARGET}")
+
+
+if __name__ == '__main__':
+    main()